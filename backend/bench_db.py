@@ -0,0 +1,109 @@
+"""
+Message insert throughput under each database configuration.
+
+    python bench_db.py --messages 2000 --writers 1 4
+    python bench_db.py --database-url postgresql+psycopg://user:pw@localhost/bench
+
+Every insert is committed on its own, like send_message does. The SQLite
+configurations run against a fresh temporary file: "sqlite-default" is
+SQLite's stock rollback journal with synchronous=FULL, "sqlite-wal" uses the
+app's SQLITE_PRAGMAS. --database-url adds a run against that database with
+a connection pool sized to the writers (its message table is created if needed
+and the benchmark rows are deleted afterwards).
+"""
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app import app, db, User, Message
+
+
+def bench(url, pragmas, engine_options, messages, writers):
+    app.config["SQLITE_PRAGMAS"] = pragmas
+    engine = create_engine(url, **engine_options)
+    db.metadata.create_all(engine, tables=[User.__table__, Message.__table__])
+    with Session(engine) as session:
+        sender = User(username=f"bench_s{os.getpid()}", password_hash=b"x")
+        recipient = User(username=f"bench_r{os.getpid()}", password_hash=b"x")
+        session.add_all([sender, recipient])
+        session.commit()
+        sender_id, recipient_id = sender.id, recipient.id
+
+    errors = []
+
+    def write(count):
+        with Session(engine) as session:
+            for i in range(count):
+                session.add(
+                    Message(
+                        sender_id=sender_id, recipient_id=recipient_id, content=f"{i}"
+                    )
+                )
+                try:
+                    session.commit()
+                except Exception as e:  # e.g. "database is locked"
+                    session.rollback()
+                    errors.append(e)
+
+    per_writer = messages // writers
+    threads = [
+        threading.Thread(target=write, args=(per_writer,)) for _ in range(writers)
+    ]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    with Session(engine) as session:
+        for model, column in ((Message, Message.sender_id), (User, User.id)):
+            session.query(model).filter(column.in_([sender_id, recipient_id])).delete(
+                synchronize_session=False
+            )
+        session.commit()
+    engine.dispose()
+    inserted = per_writer * writers - len(errors)
+    return inserted / elapsed, len(errors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--writers", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--database-url", help="also benchmark this database")
+    args = parser.parse_args()
+
+    wal_pragmas = dict(app.config["SQLITE_PRAGMAS"])
+    with tempfile.TemporaryDirectory() as tmp:
+        configs = [
+            ("sqlite-default", "default.db", {}),
+            ("sqlite-wal", "wal.db", wal_pragmas),
+        ]
+        for writers in args.writers:
+            for name, filename, pragmas in configs:
+                url = "sqlite:///" + os.path.join(tmp, f"{writers}-{filename}")
+                rate, errors = bench(url, pragmas, {}, args.messages, writers)
+                print(
+                    f"{name:<16} writers={writers:<3} {rate:8.0f} inserts/s"
+                    f"  errors={errors}"
+                )
+            if args.database_url:
+                pool = {"pool_size": writers, "pool_pre_ping": True}
+                rate, errors = bench(
+                    args.database_url, {}, pool, args.messages, writers
+                )
+                print(
+                    f"{'database-url':<16} writers={writers:<3} {rate:8.0f} inserts/s"
+                    f"  errors={errors}"
+                )
+
+
+if __name__ == "__main__":
+    main()
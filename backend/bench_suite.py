@@ -0,0 +1,325 @@
+"""
+Benchmark suite for the HTTP and Socket.IO hot paths.
+
+    python bench_suite.py                      # run and print
+    python bench_suite.py --save bench_baseline.json
+    python bench_suite.py --compare bench_baseline.json
+
+The app runs in-process against a fresh temporary SQLite database, driven
+through Flask's and Flask-SocketIO's test clients, so the numbers are the
+cost of app.py itself (handlers, queries, serialization) without network
+or event-loop noise. Synthetic users are created and befriended up front
+and every conversation is seeded with --history messages.
+
+For each operation it reports p50/p95/p99 latency, operations per second
+and the mean number of SQL statements per operation. --compare exits with
+status 1 when an operation issues more queries than in the baseline, or is
+slower than the baseline p50/p95 by more than --tolerance and by at least
+--min-delta-ms (sub-millisecond timings jitter by more than 50% between
+runs). Query counts are exact and portable; latencies only compare on the
+same machine.
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+
+def percentile(sorted_values, p):
+    index = min(len(sorted_values) - 1, int(round(p / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class Recorder:
+    """Times operations and counts the SQL statements each one issues."""
+
+    def __init__(self, engine):
+        from sqlalchemy import event
+
+        self.queries = 0
+        event.listen(engine, "before_cursor_execute", self._count)
+        self.results = {}
+
+    def _count(self, *args):
+        self.queries += 1
+
+    def measure(self, name, operations):
+        """Run every callable in `operations`, one sample each."""
+        latencies = []
+        queries_before = self.queries
+        started = time.perf_counter()
+        for operation in operations:
+            t0 = time.perf_counter()
+            operation()
+            latencies.append(time.perf_counter() - t0)
+        elapsed = time.perf_counter() - started
+        latencies.sort()
+        self.results[name] = {
+            "count": len(latencies),
+            "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+            "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+            "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+            "ops_per_sec": round(len(latencies) / elapsed, 1),
+            "queries_per_op": round(
+                (self.queries - queries_before) / len(latencies), 3
+            ),
+        }
+
+
+def check(response, status=200):
+    if response.status_code != status:
+        raise RuntimeError(f"{response.status_code}: {response.get_data(True)}")
+    return response
+
+
+def run(args):
+    from app import app, db, User, Friendship, Message, generate_token, socketio
+    from app import insert_messages
+
+    app.config["RECEIPT_COALESCE_SECONDS"] = 0  # receipts applied inline
+    # Measure the rate limiter without ever tripping it
+    app.config["RATE_LIMITS"] = {"default": (1e9, 1e9)}
+    http = app.test_client()
+    with app.app_context():
+        db.create_all()
+        recorder = Recorder(db.engine)
+
+        def auth(token):
+            return {"Authorization": f"Bearer {token}"}
+
+        # Signup / login (through bcrypt at BCRYPT_ROUNDS)
+        names = [f"bench{i}" for i in range(args.users)]
+        password = "benchmark-password1"
+        recorder.measure(
+            "signup",
+            [
+                lambda n=n: check(
+                    http.post("/signup", json={"username": n, "password": password}),
+                    201,
+                )
+                for n in names
+            ],
+        )
+        recorder.measure(
+            "login",
+            [
+                lambda n=n: check(
+                    http.post("/login", json={"username": n, "password": password})
+                )
+                for n in names
+            ],
+        )
+
+        # Seed: user 0 is friends with everybody, each conversation has
+        # --history messages
+        users = User.query.filter(User.username.in_(names)).all()
+        users.sort(key=lambda u: names.index(u.username))
+        hub, others = users[0], users[1:]
+        for other in others:
+            db.session.add_all(
+                [
+                    Friendship(user_id=hub.id, friend_id=other.id),
+                    Friendship(user_id=other.id, friend_id=hub.id),
+                ]
+            )
+            insert_messages(
+                [
+                    Message(
+                        sender_id=(hub.id, other.id)[n % 2],
+                        recipient_id=(other.id, hub.id)[n % 2],
+                        content=f"seed {n}",
+                    )
+                    for n in range(args.history)
+                ]
+            )
+        db.session.commit()
+        tokens = {u.id: generate_token(u.id) for u in users}
+        hub_token = tokens[hub.id]
+
+        recorder.measure(
+            "friends_list",
+            [
+                lambda: check(http.get("/friends/list", headers=auth(hub_token)))
+                for _ in range(args.requests)
+            ],
+        )
+        recorder.measure(
+            "messages_history",
+            [
+                lambda o=others[i % len(others)]: check(
+                    http.get(f"/messages/history/{o.id}", headers=auth(hub_token))
+                )
+                for i in range(args.requests)
+            ],
+        )
+
+        def connect(user):
+            client = socketio.test_client(
+                app,
+                query_string=f"token={tokens[user.id]}",
+                flask_test_client=app.test_client(),
+            )
+            client.get_received()
+            return client
+
+        hub_socket = connect(hub)
+        other_sockets = {o.id: connect(o) for o in others}
+
+        def drain():
+            hub_socket.get_received()
+            for client in other_sockets.values():
+                client.get_received()
+
+        sent = []
+
+        def send(other, n):
+            hub_socket.emit(
+                "send_message", {"recipient_id": other.id, "content": f"bench {n}"}
+            )
+            # The echo to the sender carries the new message's id
+            received = hub_socket.get_received()
+            sent.append((other, received[-1]["args"][0]["id"]))
+
+        recorder.measure(
+            "send_message",
+            [
+                lambda n=n: send(others[n % len(others)], n)
+                for n in range(args.messages)
+            ],
+        )
+        drain()
+        recorder.measure(
+            "ack_read",
+            [
+                lambda o=o, m=m: other_sockets[o.id].emit(
+                    "ack_messages", {"status": "read", "message_id": m}
+                )
+                for o, m in sent
+            ],
+        )
+        drain()
+        recorder.measure(
+            "typing",
+            [
+                lambda n=n: hub_socket.emit(
+                    "i_am_writing", {"recipient_id": others[n % len(others)].id}
+                )
+                for n in range(args.messages)
+            ],
+        )
+        drain()
+        hub_socket.disconnect()
+        for client in other_sockets.values():
+            client.disconnect()
+    return recorder.results
+
+
+def print_results(results, baseline=None):
+    header = f"{'operation':<18}{'count':>7}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+    header += f"{'ops/s':>10}{'queries':>9}"
+    print(header)
+    for name, r in results.items():
+        line = (
+            f"{name:<18}{r['count']:>7}{r['p50_ms']:>9.2f}{r['p95_ms']:>9.2f}"
+            f"{r['p99_ms']:>9.2f}{r['ops_per_sec']:>10.0f}{r['queries_per_op']:>9.2f}"
+        )
+        if baseline and name in baseline:
+            b = baseline[name]
+            line += (
+                f"   (baseline p50 {b['p50_ms']:.2f}"
+                f", queries {b['queries_per_op']:.2f})"
+            )
+        print(line)
+
+
+def regressions(results, baseline, tolerance, min_delta_ms):
+    found = []
+    for name, r in results.items():
+        b = baseline.get(name)
+        if b is None:
+            continue
+        if r["queries_per_op"] > b["queries_per_op"] + 1e-9:
+            found.append(
+                f"{name}: {r['queries_per_op']:.2f} queries/op"
+                f" (baseline {b['queries_per_op']:.2f})"
+            )
+        for key in ("p50_ms", "p95_ms"):
+            slower = r[key] - b[key]
+            if r[key] > b[key] * (1 + tolerance) and slower >= min_delta_ms:
+                found.append(f"{name}: {key} {r[key]:.2f} (baseline {b[key]:.2f})")
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--history", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument(
+        "--bcrypt-rounds",
+        type=int,
+        default=4,
+        help="cost factor for signup/login (default 4: measure the app, not bcrypt)",
+    )
+    parser.add_argument("--save", metavar="PATH", help="write results as a baseline")
+    parser.add_argument("--compare", metavar="PATH", help="compare with a baseline")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.5,
+        help="allowed latency increase over the baseline (default 0.5 = 50%%)",
+    )
+    parser.add_argument(
+        "--min-delta-ms",
+        type=float,
+        default=1.0,
+        help="ignore latency increases smaller than this (default 1 ms)",
+    )
+    args = parser.parse_args()
+    if args.users < 2:
+        parser.error("--users must be at least 2")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # The app reads its configuration at import time
+        os.environ.update(
+            DATABASE_URL="sqlite:///" + os.path.join(tmp, "bench.db"),
+            BCRYPT_ROUNDS=str(args.bcrypt_rounds),
+        )
+        os.environ.pop("MESSAGE_WRITE_BEHIND", None)
+        results = run(args)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+    print_results(results, baseline)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(
+                {
+                    "python": sys.version.split()[0],
+                    "args": {
+                        k: v
+                        for k, v in vars(args).items()
+                        if k not in ("save", "compare", "tolerance", "min_delta_ms")
+                    },
+                    "results": results,
+                },
+                f,
+                indent=2,
+            )
+            f.write("\n")
+    if baseline:
+        found = regressions(results, baseline, args.tolerance, args.min_delta_ms)
+        for line in found:
+            print("REGRESSION", line)
+        if found:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
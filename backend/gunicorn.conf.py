@@ -0,0 +1,43 @@
+"""
+Production server settings: gunicorn with eventlet workers.
+
+    flask upgrade-db && flask replay-message-journal
+    gunicorn -c gunicorn.conf.py app:app
+
+Schema migrations and journal replay run once, before the server starts,
+never in the serving processes. "flask upgrade-db" is "flask db upgrade"
+that also adopts databases created by db.create_all() (older versions ran
+it on every start), stamping them with the revision they already match.
+
+Everything below can be overridden from the environment.
+
+One gunicorn worker can hold thousands of sockets (WORKER_CONNECTIONS).
+Run more than one (WEB_CONCURRENCY) only with SOCKETIO_MESSAGE_QUEUE set
+and a load balancer with sticky sessions in front: gunicorn itself hands
+requests to any worker, and a Socket.IO client's polling requests must keep
+reaching the worker holding its session. It is usually simpler to run
+several single-worker instances on different ports behind the balancer.
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+worker_class = "eventlet"
+workers = int(os.environ.get("WEB_CONCURRENCY", 1))
+worker_connections = int(os.environ.get("WORKER_CONNECTIONS", 1000))
+# Idle seconds an HTTP keep-alive connection is held open
+keepalive = int(os.environ.get("KEEPALIVE_SECONDS", 5))
+# Seconds a worker gets to finish in-flight requests after SIGTERM
+graceful_timeout = int(os.environ.get("GRACEFUL_TIMEOUT_SECONDS", 30))
+# Workers that stop notifying the master for this long are restarted
+timeout = int(os.environ.get("WORKER_TIMEOUT_SECONDS", 60))
+accesslog = os.environ.get("ACCESS_LOG", "-")
+
+
+def worker_exit(server, worker):
+    # Persist what this worker still holds in memory before it goes away
+    from app import app, flush_receipts, flush_write_behind
+
+    with app.app_context():
+        flush_write_behind()
+        flush_receipts()
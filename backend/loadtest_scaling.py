@@ -0,0 +1,187 @@
+"""
+Socket.IO fan-out load test across several worker processes.
+
+    python loadtest_scaling.py --workers 1 2 4 --pairs 20 --messages 50
+
+For each worker count, N app processes are started on consecutive ports,
+all sharing one temporary SQLite database and one message queue (a local
+fakeredis TCP stand-in unless --redis is given). The two users of every
+friend pair connect to different workers whenever N > 1, so each message
+has to cross processes through the queue. Prints delivered messages per
+second for every worker count.
+
+Needs python-socketio[client]; fakeredis too when --redis is not given.
+"""
+
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+HOST = "127.0.0.1"
+
+
+def serve(port):
+    # Worker process: the same app as production, monkey-patched eventlet
+    import eventlet
+
+    eventlet.monkey_patch()
+    from app import app, socketio
+
+    socketio.run(app, host=HOST, port=port, log_output=False)
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind((HOST, 0))
+        return s.getsockname()[1]
+
+
+def wait_for_port(port, timeout=20.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection((HOST, port), timeout=0.5).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"worker on port {port} did not start")
+
+
+def start_fake_redis():
+    from fakeredis import TcpFakeServer
+
+    port = free_port()
+    server = TcpFakeServer((HOST, port), server_type="redis")
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"redis://{HOST}:{port}/0"
+
+
+def create_pairs(count):
+    """Create `count` pairs of friends; returns [(id_a, token_a, id_b, token_b)]."""
+    from app import app, db, User, Friendship, generate_token
+
+    pairs = []
+    with app.app_context():
+        db.create_all()
+        for i in range(count):
+            a = User(username=f"la{i}", password_hash=b"x")
+            b = User(username=f"lb{i}", password_hash=b"x")
+            db.session.add_all([a, b])
+            db.session.flush()
+            db.session.add_all(
+                [
+                    Friendship(user_id=a.id, friend_id=b.id),
+                    Friendship(user_id=b.id, friend_id=a.id),
+                ]
+            )
+            pairs.append((a.id, generate_token(a.id), b.id, generate_token(b.id)))
+        db.session.commit()
+    return pairs
+
+
+def run(workers, pairs, messages, env):
+    import socketio as socketio_client
+
+    ports = [free_port() for _ in range(workers)]
+    procs = [
+        subprocess.Popen(
+            [sys.executable, __file__, "--serve", str(port)],
+            env=env,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        )
+        for port in ports
+    ]
+    try:
+        for port in ports:
+            wait_for_port(port)
+
+        expected = len(pairs) * messages
+        delivered = [0]
+        lock = threading.Lock()
+        done = threading.Event()
+
+        def on_new_message(payload):
+            with lock:
+                delivered[0] += 1
+                if delivered[0] >= expected:
+                    done.set()
+
+        senders = []
+        clients = []
+        for i, (a_id, a_token, b_id, b_token) in enumerate(pairs):
+            sender = socketio_client.Client()
+            receiver = socketio_client.Client()
+            receiver.on("new_message", on_new_message)
+            sender_port = ports[i % workers]
+            receiver_port = ports[(i + 1) % workers]
+            sender.connect(
+                f"http://{HOST}:{sender_port}?token={a_token}",
+                transports=["websocket"],
+            )
+            receiver.connect(
+                f"http://{HOST}:{receiver_port}?token={b_token}",
+                transports=["websocket"],
+            )
+            senders.append((sender, b_id))
+            clients += [sender, receiver]
+
+        def blast(client, recipient_id):
+            for n in range(messages):
+                client.emit(
+                    "send_message", {"recipient_id": recipient_id, "content": f"{n}"}
+                )
+
+        started = time.perf_counter()
+        threads = [threading.Thread(target=blast, args=s) for s in senders]
+        for t in threads:
+            t.start()
+        done.wait(timeout=120)
+        elapsed = time.perf_counter() - started
+        for client in clients:
+            client.disconnect()
+        return delivered[0], expected, elapsed
+    finally:
+        for proc in procs:
+            proc.terminate()
+        for proc in procs:
+            proc.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--pairs", type=int, default=20)
+    parser.add_argument("--messages", type=int, default=50)
+    parser.add_argument("--redis", help="message queue URL (default: fakeredis)")
+    parser.add_argument("--serve", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.serve:
+        serve(args.serve)
+        return
+
+    queue = args.redis or start_fake_redis()
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(
+            os.environ,
+            DATABASE_URL="sqlite:///" + os.path.join(tmp, "loadtest.db"),
+            SOCKETIO_MESSAGE_QUEUE=queue,
+        )
+        # The app reads its configuration at import time
+        os.environ.update(env)
+        pairs = create_pairs(args.pairs)
+        print(f"{args.pairs} pairs x {args.messages} messages")
+        for workers in args.workers:
+            delivered, expected, elapsed = run(workers, pairs, args.messages, env)
+            print(
+                f"workers={workers:<3} delivered={delivered}/{expected} "
+                f"elapsed={elapsed:.2f}s  {delivered / elapsed:.0f} msg/s"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""message search index
+
+SQLite: external-content FTS5 table message_fts plus the triggers that keep
+it in sync, filled from the existing messages. PostgreSQL: GIN index over
+to_tsvector('simple', content).
+
+A batch migration of the message table on SQLite recreates the table and
+loses the triggers; run "flask rebuild-message-search" after one.
+
+Revision ID: 4b21a42c819d
+Revises: 5ff9e0b9e0d4
+Create Date: 2026-10-18 13:40:12.512204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4b21a42c819d'
+down_revision = '5ff9e0b9e0d4'
+branch_labels = None
+depends_on = None
+
+
+SQLITE_UPGRADE = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS message_fts USING fts5("
+    "content, content='message', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS message_fts_insert AFTER INSERT ON message "
+    "WHEN new.content IS NOT NULL BEGIN "
+    "INSERT INTO message_fts(rowid, content) VALUES (new.rowid, new.content); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS message_fts_delete AFTER DELETE ON message "
+    "WHEN old.content IS NOT NULL BEGIN "
+    "INSERT INTO message_fts(message_fts, rowid, content) "
+    "VALUES ('delete', old.rowid, old.content); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS message_fts_update "
+    "AFTER UPDATE OF content ON message BEGIN "
+    "INSERT INTO message_fts(message_fts, rowid, content) "
+    "SELECT 'delete', old.rowid, old.content WHERE old.content IS NOT NULL; "
+    "INSERT INTO message_fts(rowid, content) "
+    "SELECT new.rowid, new.content WHERE new.content IS NOT NULL; "
+    "END",
+    "INSERT INTO message_fts(message_fts) VALUES ('rebuild')",
+]
+SQLITE_DOWNGRADE = [
+    "DROP TRIGGER IF EXISTS message_fts_update",
+    "DROP TRIGGER IF EXISTS message_fts_delete",
+    "DROP TRIGGER IF EXISTS message_fts_insert",
+    "DROP TABLE IF EXISTS message_fts",
+]
+POSTGRESQL_UPGRADE = [
+    "CREATE INDEX IF NOT EXISTS ix_message_content_fts ON message "
+    "USING gin (to_tsvector('simple', coalesce(content, '')))",
+]
+POSTGRESQL_DOWNGRADE = ["DROP INDEX IF EXISTS ix_message_content_fts"]
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    statements = {"sqlite": SQLITE_UPGRADE, "postgresql": POSTGRESQL_UPGRADE}
+    for statement in statements.get(dialect, []):
+        op.execute(statement)
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    statements = {"sqlite": SQLITE_DOWNGRADE, "postgresql": POSTGRESQL_DOWNGRADE}
+    for statement in statements.get(dialect, []):
+        op.execute(statement)
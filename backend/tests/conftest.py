@@ -0,0 +1,87 @@
+"""
+Shared fixtures. app.py reads its configuration at import time, so the
+environment is pointed at a temporary database and journal directory
+before it is imported.
+
+    cd backend && python -m pytest
+"""
+
+import os
+import sys
+import tempfile
+
+import pytest
+from sqlalchemy import event
+
+_tmp = tempfile.mkdtemp(prefix="lahcenger-tests-")
+os.environ.update(
+    DATABASE_URL="sqlite:///" + os.path.join(_tmp, "test.db"),
+    WRITE_BEHIND_JOURNAL_DIR=os.path.join(_tmp, "journal"),
+    BCRYPT_ROUNDS="4",
+)
+for _name in (
+    "MESSAGE_WRITE_BEHIND",
+    "SOCKETIO_MESSAGE_QUEUE",
+    "CLUSTER_BUS_URL",
+    "FRIEND_CACHE_URL",
+    "PRESENCE_URL",
+    "RATE_LIMIT_URL",
+):
+    os.environ.pop(_name, None)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as lahcenger  # noqa: E402
+
+
+class QueryCounter:
+    """Counts the SQL statements run on an engine inside a with block."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+
+    def _count(self, *args):
+        self.count += 1
+
+    def __enter__(self):
+        event.listen(self.engine, "before_cursor_execute", self._count)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self._count)
+
+
+@pytest.fixture
+def app(monkeypatch, tmp_path):
+    """The app with empty tables and fresh in-process caches."""
+    monkeypatch.setattr(lahcenger, "friend_cache", lahcenger.make_friend_cache())
+    monkeypatch.setattr(lahcenger, "rate_limiter", lahcenger.make_rate_limiter())
+    (tmp_path / "uploads").mkdir()
+    monkeypatch.setattr(lahcenger, "UPLOAD_FOLDER", str(tmp_path / "uploads"))
+    with lahcenger.app.app_context():
+        lahcenger.db.create_all()
+        yield lahcenger.app
+        lahcenger.db.session.rollback()
+        for table in reversed(lahcenger.db.metadata.sorted_tables):
+            lahcenger.db.session.execute(table.delete())
+        lahcenger.db.session.commit()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def make_user(app):
+    def make(username):
+        user = lahcenger.User(username=username, password_hash=b"x")
+        lahcenger.db.session.add(user)
+        lahcenger.db.session.commit()
+        return user
+
+    return make
+
+
+def auth(user):
+    return {"Authorization": f"Bearer {lahcenger.generate_token(user.id)}"}
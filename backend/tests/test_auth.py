@@ -0,0 +1,30 @@
+from conftest import lahcenger
+
+
+def test_login_succeeds_when_the_rehash_cannot_run(client, app, monkeypatch):
+    weak = lahcenger.bcrypt.hashpw(b"password123", lahcenger.bcrypt.gensalt(4))
+    user = lahcenger.User(username="alice", password_hash=weak)
+    lahcenger.db.session.add(user)
+    lahcenger.db.session.commit()
+    monkeypatch.setitem(app.config, "BCRYPT_ROUNDS", 5)
+
+    def busy(password):
+        raise lahcenger.PasswordHasherBusy()
+
+    # The password check gets through, the pool is full by the upgrade
+    with monkeypatch.context() as m:
+        m.setattr(lahcenger, "hash_password", busy)
+        response = client.post(
+            "/login", json={"username": "alice", "password": "password123"}
+        )
+    assert response.status_code == 200
+    assert "token" in response.json
+    lahcenger.db.session.refresh(user)
+    assert user.password_hash == weak  # upgraded on a later login
+
+    response = client.post(
+        "/login", json={"username": "alice", "password": "password123"}
+    )
+    assert response.status_code == 200
+    lahcenger.db.session.refresh(user)
+    assert not lahcenger.password_needs_rehash(user.password_hash)
@@ -0,0 +1,114 @@
+"""
+The cluster event listener: a bad event or a dropped connection must not
+stop it, and after resubscribing it catches up on what it missed.
+"""
+
+import json
+
+import pytest
+
+from conftest import lahcenger
+
+
+class Stop(Exception):
+    pass
+
+
+class FakePubSub:
+    """Plays one scripted session: the events, then the connection drops."""
+
+    def __init__(self, events):
+        self.events = events
+        self.closed = False
+
+    def subscribe(self, channel):
+        pass
+
+    def listen(self):
+        for data in self.events:
+            yield {"data": data}
+        raise ConnectionError("connection lost")
+
+    def close(self):
+        self.closed = True
+
+
+class FakeClusterClient:
+    def __init__(self, *sessions):
+        self.sessions = list(sessions)
+        self.pubsubs = []
+
+    def pubsub(self, ignore_subscribe_messages=False):
+        self.pubsubs.append(FakePubSub(self.sessions.pop(0)))
+        return self.pubsubs[-1]
+
+
+def event(kind, **data):
+    return json.dumps({"host_id": "other-worker", "kind": kind, "data": data})
+
+
+@pytest.fixture
+def revocations(monkeypatch):
+    monkeypatch.setattr(lahcenger, "revoked_jtis", {})
+    monkeypatch.setattr(lahcenger, "_revoked_expiries", [])
+    monkeypatch.setattr(lahcenger, "_revoked_loaded", False)
+
+
+def test_bad_events_are_skipped(app, monkeypatch):
+    handled = []
+
+    def broken(**data):
+        raise RuntimeError("handler bug")
+
+    monkeypatch.setitem(lahcenger.cluster_handlers, "broken", broken)
+    monkeypatch.setitem(lahcenger.cluster_handlers, "ok", lambda **d: handled.append(d))
+    lahcenger.handle_cluster_message("not json")
+    lahcenger.handle_cluster_message(json.dumps({"kind": "ok"}))
+    lahcenger.handle_cluster_message(event("broken"))
+    lahcenger.handle_cluster_message(event("ok", user_id="u1"))
+    assert handled == [{"user_id": "u1"}]
+
+
+def test_listener_resubscribes_and_resyncs(app, monkeypatch, revocations):
+    handled, sleeps, resyncs = [], [], []
+    monkeypatch.setitem(lahcenger.cluster_handlers, "ok", lambda **d: handled.append(d))
+    monkeypatch.setattr(lahcenger, "resync_cluster_state", lambda: resyncs.append(1))
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        if len(sleeps) == 2:
+            raise Stop
+
+    monkeypatch.setattr(lahcenger.socketio, "sleep", sleep)
+    cluster = FakeClusterClient([event("ok", n=1), "garbage"], [event("ok", n=2)])
+    monkeypatch.setattr(lahcenger, "cluster_client", cluster)
+
+    with pytest.raises(Stop):
+        lahcenger._listen_cluster_events()
+    assert handled == [{"n": 1}, {"n": 2}]
+    # Only the second subscription can have missed events
+    assert resyncs == [1]
+    assert sleeps == [1, 1]
+    assert all(pubsub.closed for pubsub in cluster.pubsubs)
+
+
+def test_resync_catches_up(app, make_user, revocations):
+    exp = lahcenger.now_utc().timestamp() + 3600
+    lahcenger.load_revoked_tokens()
+    # Revoked by another worker while this one was not listening
+    lahcenger.db.session.add(
+        lahcenger.RevokedToken(
+            jti="missed",
+            expires_at=lahcenger.datetime.datetime.fromtimestamp(
+                exp, lahcenger.datetime.timezone.utc
+            ),
+        )
+    )
+    lahcenger.db.session.commit()
+    lahcenger.friend_cache.set("u1", {"u2"})
+    assert not lahcenger.is_jti_revoked("missed")
+
+    lahcenger.resync_cluster_state()
+    assert lahcenger.is_jti_revoked("missed")
+    assert lahcenger.friend_cache.get("u1") is None
+    assert not lahcenger.username_index.loaded
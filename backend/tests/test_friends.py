@@ -0,0 +1,63 @@
+import pytest
+
+from conftest import QueryCounter, auth, lahcenger
+
+
+def seed_hub(make_user, name, size):
+    """A user with `size` friends, incoming and sent pending requests."""
+    hub = make_user(name)
+    for i in range(size):
+        friend = make_user(f"{name}f{i}")
+        sender = make_user(f"{name}i{i}")
+        recipient = make_user(f"{name}s{i}")
+        lahcenger.db.session.add_all(
+            [
+                lahcenger.Friendship(user_id=hub.id, friend_id=friend.id),
+                lahcenger.Friendship(user_id=friend.id, friend_id=hub.id),
+                lahcenger.FriendRequest(from_user_id=sender.id, to_user_id=hub.id),
+                lahcenger.FriendRequest(from_user_id=hub.id, to_user_id=recipient.id),
+            ]
+        )
+    lahcenger.db.session.commit()
+    return hub
+
+
+@pytest.mark.parametrize(
+    "path",
+    ["/friends/list", "/friends/incoming_requests", "/friends/sent_requests"],
+)
+def test_friend_lists_run_a_constant_number_of_queries(client, make_user, path):
+    small = seed_hub(make_user, "small", 2)
+    large = seed_hub(make_user, "large", 25)
+    # Warm-up: the revoked-token cache loads on the first authenticated request
+    client.get(path, headers=auth(small))
+
+    counts = []
+    for hub, size in ((small, 2), (large, 25)):
+        headers = auth(hub)
+        with QueryCounter(lahcenger.db.engine) as counter:
+            response = client.get(path, headers=headers)
+        assert response.status_code == 200
+        assert len(response.json) == size
+        counts.append(counter.count)
+    assert counts[0] == counts[1]
+
+
+def test_search_pages_past_the_cached_matches(client, make_user, monkeypatch):
+    index = lahcenger.UsernameIndex(max_results=3, cache_size=10)
+    monkeypatch.setattr(lahcenger, "username_index", index)
+    me = make_user("annie")
+    names = sorted(make_user(f"ann{i}").username for i in range(7))
+
+    pages, offset = [], 0
+    while True:
+        response = client.get(
+            f"/users/search?q=ann&offset={offset}&limit=2", headers=auth(me)
+        )
+        assert response.status_code == 200
+        if not response.json:
+            break
+        pages.append([user["username"] for user in response.json])
+        offset += 2
+    assert sum(pages, []) == names
+    assert [len(page) for page in pages] == [2, 2, 2, 1]
@@ -0,0 +1,47 @@
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from conftest import lahcenger
+
+
+@pytest.fixture
+def metrics_token(app, monkeypatch):
+    monkeypatch.setitem(app.config, "METRICS_TOKEN", "scrape-secret")
+    return "scrape-secret"
+
+
+def test_metrics_disabled_without_a_token(client):
+    assert client.get("/metrics").status_code == 404
+
+
+def test_metrics_ignore_the_client_address(client, metrics_token):
+    # What every request looks like behind a reverse proxy on the same host
+    response = client.get("/metrics", environ_base={"REMOTE_ADDR": "127.0.0.1"})
+    assert response.status_code == 404
+    wrong = {"Authorization": "Bearer not-the-secret"}
+    assert client.get("/metrics", headers=wrong).status_code == 404
+
+
+def test_metrics_with_the_token(client, metrics_token):
+    client.get("/check_token")
+    response = client.get(
+        "/metrics", headers={"Authorization": f"Bearer {metrics_token}"}
+    )
+    assert response.status_code == 200
+    assert response.mimetype == "text/plain"
+    assert "http_requests_total{" in response.get_data(as_text=True)
+    assert lahcenger.render_metrics().startswith("# HELP")
+
+
+def selects_timed():
+    counts, _ = lahcenger.sql_statement_seconds._values.get(("SELECT",), [[0], 0])
+    return sum(counts)
+
+
+def test_failed_statements_are_timed(app):
+    before = selects_timed()
+    with lahcenger.db.engine.connect() as conn:
+        with pytest.raises(OperationalError):
+            conn.exec_driver_sql("SELECT * FROM no_such_table")
+        assert conn.info["sql_started"] == []
+    assert selects_timed() == before + 1
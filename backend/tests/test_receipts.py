@@ -0,0 +1,90 @@
+import pytest
+
+from conftest import lahcenger
+
+
+@pytest.fixture
+def receipts(app, monkeypatch):
+    """Receipt coalescing with background flushes recorded, not started."""
+    started = []
+    monkeypatch.setattr(lahcenger, "pending_acks", {})
+    monkeypatch.setattr(lahcenger, "pending_receipts", {})
+    monkeypatch.setattr(lahcenger, "_receipt_flush_scheduled", False)
+    monkeypatch.setitem(app.config, "RECEIPT_COALESCE_SECONDS", 10)
+    monkeypatch.setattr(
+        lahcenger.socketio, "start_background_task", lambda *a: started.append(a)
+    )
+    return started
+
+
+@pytest.fixture
+def message(make_user):
+    alice, bob = make_user("alice"), make_user("bob")
+    msg = lahcenger.Message(sender_id=alice.id, recipient_id=bob.id, content="hi")
+    lahcenger.insert_messages([msg])
+    lahcenger.db.session.commit()
+    return msg
+
+
+def fail(*args):
+    raise RuntimeError("database is locked")
+
+
+def status_of(msg):
+    lahcenger.db.session.expire_all()
+    return lahcenger.db.session.get(lahcenger.Message, msg.id).status
+
+
+def test_failed_flush_keeps_the_marks(receipts, message, monkeypatch):
+    lahcenger.queue_acks(message.recipient_id, [message.id], "read")
+    with monkeypatch.context() as m:
+        m.setattr(lahcenger, "allocate_sync_seqs", fail)
+        with pytest.raises(RuntimeError):
+            lahcenger.flush_receipts()
+    assert status_of(message) == "sent"
+    assert len(lahcenger.pending_receipts) == 1
+
+    lahcenger.flush_receipts()
+    assert status_of(message) == "read"
+    assert lahcenger.pending_receipts == {}
+
+
+def test_background_flush_logs_and_retries(receipts, message, monkeypatch, caplog):
+    lahcenger.queue_acks(message.recipient_id, [message.id], "received")
+    assert [task[0] for task in receipts] == [lahcenger._flush_receipts_later]
+    monkeypatch.setattr(lahcenger, "allocate_sync_seqs", fail)
+
+    lahcenger._flush_receipts_later(0)
+    assert "receipt flush failed" in caplog.text
+    assert len(receipts) == 2  # rescheduled
+    assert len(lahcenger.pending_receipts) == 1
+
+
+def test_ack_waits_for_a_message_buffered_elsewhere(receipts, make_user):
+    alice, bob = make_user("alice"), make_user("bob")
+    # Accepted by another worker, whose write-behind has not inserted it yet
+    msg = lahcenger.Message(
+        id="buffered", sender_id=alice.id, recipient_id=bob.id, content="hi"
+    )
+    lahcenger.queue_acks(bob.id, [msg.id], "read")
+    lahcenger.flush_receipts()
+    assert list(lahcenger.pending_acks) == [(bob.id, msg.id, "read")]
+    assert len(receipts) == 2  # looked up again later
+
+    lahcenger.insert_messages([msg])
+    lahcenger.db.session.commit()
+    lahcenger.flush_receipts()
+    assert lahcenger.pending_acks == {}
+    assert status_of(msg) == "read"
+
+
+def test_unresolvable_acks_are_dropped(receipts, message, app):
+    lahcenger.queue_acks(message.recipient_id, ["missing"], "read")
+    lahcenger.queue_acks(message.sender_id, [message.id], "read")  # not theirs
+    lahcenger._resolve_acks()
+    assert list(lahcenger.pending_acks) == [(message.recipient_id, "missing", "read")]
+    lahcenger._resolve_acks(
+        lahcenger.time.time() + app.config["ACK_RESOLVE_SECONDS"] + 1
+    )
+    assert lahcenger.pending_acks == {}
+    assert lahcenger.pending_receipts == {}
@@ -0,0 +1,133 @@
+"""
+The shared (Redis) backends against fakeredis. Two clients of one fake
+server stand in for two workers. The rate limiter's Lua script needs
+fakeredis' Lua support (the lupa package).
+"""
+
+import pytest
+
+from conftest import QueryCounter, lahcenger
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+
+def client(server):
+    return fakeredis.FakeRedis(server=server)
+
+
+# Friend cache
+
+
+@pytest.fixture
+def redis_friends(app, server, monkeypatch):
+    cache = lahcenger.RedisFriendCache(client(server), ttl=60)
+    monkeypatch.setattr(lahcenger, "friend_cache", cache)
+    return cache
+
+
+def test_friend_cache_round_trip(redis_friends, make_user):
+    alice, bob = make_user("alice"), make_user("bob")
+    lahcenger.db.session.add(lahcenger.Friendship(user_id=alice.id, friend_id=bob.id))
+    lahcenger.db.session.commit()
+
+    assert lahcenger.friend_ids(alice.id) == {bob.id}
+    with QueryCounter(lahcenger.db.engine) as counter:
+        assert lahcenger.are_friends(alice.id, bob.id)
+    assert counter.count == 0
+    assert 0 < redis_friends.client.ttl(f"friends:{alice.id}") <= 60
+
+
+def test_friend_cache_remembers_users_without_friends(redis_friends, make_user):
+    loner = make_user("loner")
+    assert lahcenger.friend_ids(loner.id) == set()
+    # Cached through the sentinel member, which never shows up as a friend
+    assert redis_friends.get(loner.id) == set()
+    with QueryCounter(lahcenger.db.engine) as counter:
+        assert lahcenger.friend_ids(loner.id) == set()
+    assert counter.count == 0
+
+
+def test_friend_cache_invalidation_is_shared(server, make_user, app):
+    worker_a = lahcenger.RedisFriendCache(client(server), ttl=60)
+    worker_b = lahcenger.RedisFriendCache(client(server), ttl=60)
+    worker_a.set("u1", {"u2"})
+    assert worker_b.get("u1") == {"u2"}
+    worker_b.delete("u1")
+    assert worker_a.get("u1") is None
+
+
+# Rate limiter
+
+
+def test_rate_limiter_bucket(server):
+    pytest.importorskip("lupa")
+    limiter = lahcenger.RedisRateLimiter(client(server))
+    now = 1000.0
+    waits = [limiter.hit("u1:send_message", 2.0, 3, now) for _ in range(4)]
+    assert waits == [0.0, 0.0, 0.0, 0.5]
+    assert limiter.hit("u1:send_message", 2.0, 3, now + 0.5) == 0.0
+    # Other keys have their own buckets
+    assert limiter.hit("u2:send_message", 2.0, 3, now) == 0.0
+    assert 0 < limiter.client.ttl("ratelimit:u1:send_message") <= 3
+
+
+def test_rate_limiter_is_shared_between_workers(server):
+    pytest.importorskip("lupa")
+    worker_a = lahcenger.RedisRateLimiter(client(server))
+    worker_b = lahcenger.RedisRateLimiter(client(server))
+    now = 1000.0
+    assert worker_a.hit("u1:sync", 1.0, 2, now) == 0.0
+    assert worker_b.hit("u1:sync", 1.0, 2, now) == 0.0
+    assert worker_a.hit("u1:sync", 1.0, 2, now) == 1.0
+
+
+# Presence
+
+
+def test_presence_online_until_every_connection_expires(server):
+    store = lahcenger.RedisPresenceStore(client(server), ttl=30)
+    now = 1000.0
+    store.touch({"u1": {"a:1": now + 30, "a:2": now + 5}, "u2": {"a:3": now + 30}})
+    assert store.online(["u1", "u2", "u3"], now) == {"u1", "u2"}
+    assert store.online(["u1"], now + 10) == {"u1"}
+    assert store.expired(now + 10) == []
+    assert store.online(["u1", "u2"], now + 31) == set()
+    assert sorted(store.expired(now + 31)) == ["u1", "u2"]
+    assert store.expired(now + 31) == []
+
+
+def test_presence_change_is_announced_once(server):
+    worker_a = lahcenger.RedisPresenceStore(client(server), ttl=30)
+    worker_b = lahcenger.RedisPresenceStore(client(server), ttl=30)
+    assert worker_a.announce({"u1": True}) == {"u1": True}
+    assert worker_b.announce({"u1": True}) == {}
+    assert worker_b.announce({"u1": False, "u2": False}) == {"u1": False}
+    assert worker_a.announce({"u1": False}) == {}
+
+
+def test_presence_flush_with_shared_store(app, server, make_user, monkeypatch):
+    alice, bob = make_user("alice"), make_user("bob")
+    lahcenger.db.session.add(lahcenger.Friendship(user_id=bob.id, friend_id=alice.id))
+    lahcenger.db.session.commit()
+    store = lahcenger.RedisPresenceStore(client(server), ttl=30)
+    monkeypatch.setattr(lahcenger, "presence_store", store)
+    monkeypatch.setattr(lahcenger, "presence_checks", {})
+    monkeypatch.setattr(lahcenger, "_presence_started", True)
+    emitted = []
+    monkeypatch.setattr(lahcenger, "emit_to_users", lambda *args: emitted.append(args))
+
+    lahcenger.presence_joined(bob.id, "sid1")
+    lahcenger.flush_presence()
+    assert emitted == [("presence", {"online": [bob.id], "offline": []}, alice.id)]
+
+    lahcenger.presence_left(bob.id, "sid1")
+    grace = app.config["PRESENCE_GRACE_SECONDS"]
+    lahcenger.flush_presence(lahcenger.time.time() + grace / 2)
+    assert len(emitted) == 1
+    lahcenger.flush_presence(lahcenger.time.time() + grace + 1)
+    assert emitted[-1] == ("presence", {"online": [], "offline": [bob.id]}, alice.id)
@@ -0,0 +1,82 @@
+"""
+"flask upgrade-db" on databases without migration history, each in a
+subprocess with its own DATABASE_URL.
+"""
+
+import functools
+import os
+import sqlite3
+import subprocess
+import sys
+
+import pytest
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def flask(db_path, *args):
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{db_path}", FLASK_APP="app.py")
+    return subprocess.run(
+        [sys.executable, "-m", "flask", *args],
+        cwd=BACKEND,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+@functools.lru_cache()
+def head():
+    out = subprocess.run(
+        [sys.executable, "-m", "flask", "db", "heads"],
+        cwd=BACKEND,
+        env=dict(os.environ, FLASK_APP="app.py"),
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return out.split()[0]
+
+
+def version(db_path):
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute("SELECT version_num FROM alembic_version").fetchone()[0]
+
+
+def drop_history(db_path):
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("DROP TABLE alembic_version")
+
+
+@pytest.mark.parametrize("revision", ["af9b81654cd0", "b2119d7ac612"])
+def test_upgrade_adopts_unversioned_database(tmp_path, revision):
+    db_path = tmp_path / "legacy.db"
+    # The schema of that revision, as create_all() left it: no history
+    flask(db_path, "db", "upgrade", revision)
+    drop_history(db_path)
+
+    flask(db_path, "upgrade-db")
+    assert version(db_path) == head()
+    flask(db_path, "upgrade-db")  # and again on the next start
+
+
+def test_upgrade_adopts_current_create_all_database(tmp_path):
+    db_path = tmp_path / "created.db"
+    flask(db_path, "init-db")
+    drop_history(db_path)
+    flask(db_path, "upgrade-db")
+    assert version(db_path) == head()
+
+
+def test_upgrade_creates_a_fresh_database(tmp_path):
+    db_path = tmp_path / "new.db"
+    flask(db_path, "upgrade-db")
+    assert version(db_path) == head()
+
+
+def test_init_db_is_stamped(tmp_path):
+    db_path = tmp_path / "init.db"
+    flask(db_path, "init-db")
+    assert version(db_path) == head()
+    flask(db_path, "upgrade-db")
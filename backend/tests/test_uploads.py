@@ -0,0 +1,88 @@
+import datetime
+import io
+import os
+
+import pytest
+
+from conftest import auth, lahcenger
+
+
+def upload(client, user, data, filename="photo.bin"):
+    return client.post(
+        f"/uploads?filename={filename}",
+        data=data,
+        headers={**auth(user), "Content-Type": "application/octet-stream"},
+    )
+
+
+def blob_file(sha256):
+    return os.path.join(lahcenger.UPLOAD_FOLDER, lahcenger.Blob.query.get(sha256).path)
+
+
+def test_identical_uploads_share_one_blob(client, make_user):
+    alice = make_user("alice")
+    first = upload(client, alice, b"same bytes")
+    second = upload(client, alice, b"same bytes")
+    assert first.status_code == second.status_code == 201
+    blobs = lahcenger.Blob.query.all()
+    assert len(blobs) == 1 and blobs[0].ref_count == 2
+    assert lahcenger.Attachment.query.count() == 2
+
+
+def test_image_uploads_get_thumbnails(client, make_user):
+    Image = pytest.importorskip("PIL.Image")
+    png = io.BytesIO()
+    Image.new("RGB", (1200, 800), "red").save(png, "PNG")
+    response = upload(client, make_user("alice"), png.getvalue(), "red.png")
+    assert response.status_code == 201
+    blob = lahcenger.Blob.query.one()
+    assert blob.has_thumbnails
+    for name in lahcenger.app.config["THUMBNAIL_SIZES"]:
+        path = lahcenger.thumbnail_path(blob, name)
+        assert os.path.exists(os.path.join(lahcenger.UPLOAD_FOLDER, path))
+
+
+def test_blob_inserted_concurrently_is_counted(client, make_user, monkeypatch):
+    alice = make_user("alice")
+    content = b"raced bytes"
+    sha256 = lahcenger.hashlib.sha256(content).hexdigest()
+    engine = lahcenger.db.engine
+
+    def insert_first(blob):
+        # Another worker stores the same content while this one is busy
+        with engine.begin() as conn:
+            conn.execute(
+                lahcenger.Blob.__table__.insert().values(
+                    sha256=sha256, path=blob.path, size=len(content), ref_count=1
+                )
+            )
+        return False
+
+    monkeypatch.setattr(lahcenger, "make_thumbnails", insert_first)
+    assert upload(client, alice, content).status_code == 201
+    assert lahcenger.Blob.query.get(sha256).ref_count == 2
+
+
+def test_purge_reclaims_unsent_attachments_only(client, make_user):
+    alice, bob = make_user("alice"), make_user("bob")
+    sent = upload(client, alice, b"sent").json["attachment_id"]
+    unsent = upload(client, alice, b"unsent").json["attachment_id"]
+    shared = upload(client, alice, b"shared").json["attachment_id"]
+    upload(client, alice, b"shared")
+    lahcenger.db.session.add(
+        lahcenger.Message(sender_id=alice.id, recipient_id=bob.id, attachment_id=sent)
+    )
+    lahcenger.db.session.commit()
+    unsent_sha = lahcenger.Attachment.query.get(unsent).blob_sha256
+    unsent_file = blob_file(unsent_sha)
+    shared_sha = lahcenger.Attachment.query.get(shared).blob_sha256
+
+    later = lahcenger.now_utc() + datetime.timedelta(seconds=1)
+    assert lahcenger.purge_unsent_attachments(later) == 3
+    assert lahcenger.Attachment.query.get(sent) is not None
+    assert lahcenger.Blob.query.get(unsent_sha) is None
+    assert not os.path.exists(unsent_file)
+    # Both references to the shared blob were unsent uploads
+    assert lahcenger.Blob.query.get(shared_sha) is None
+    # Nothing older than the cutoff is left
+    assert lahcenger.purge_unsent_attachments(later) == 0
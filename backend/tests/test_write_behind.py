@@ -0,0 +1,185 @@
+import fcntl
+import json
+import os
+import threading
+
+import pytest
+
+from conftest import lahcenger
+
+
+@pytest.fixture
+def journal_dir(tmp_path):
+    return str(tmp_path / "journal")
+
+
+@pytest.fixture
+def writer(app, journal_dir, monkeypatch):
+    """A writer whose delayed flushes are recorded instead of started."""
+    scheduled = []
+    monkeypatch.setattr(
+        lahcenger.socketio, "start_background_task", lambda *a: scheduled.append(a)
+    )
+    w = lahcenger.WriteBehindWriter(journal_dir, max_batch=3, max_delay=10, fsync=False)
+    w.scheduled = scheduled
+    return w
+
+
+@pytest.fixture
+def users(make_user):
+    return make_user("alice"), make_user("bob")
+
+
+def new_message(users, content):
+    alice, bob = users
+    return lahcenger.Message(sender_id=alice.id, recipient_id=bob.id, content=content)
+
+
+def stored_contents():
+    lahcenger.db.session.expire_all()
+    return sorted(m.content for m in lahcenger.Message.query.all())
+
+
+def write_journal(journal_dir, name, records, tail=""):
+    os.makedirs(journal_dir, exist_ok=True)
+    with open(os.path.join(journal_dir, name), "w") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+        f.write(tail)
+
+
+def record(users, content):
+    msg = new_message(users, content)
+    msg.id = lahcenger.uuid.uuid4().hex
+    msg.status = "sent"
+    msg.created_at = lahcenger.now_utc().replace(tzinfo=None)
+    return lahcenger._message_record(msg)
+
+
+def journals(journal_dir):
+    return sorted(n for n in os.listdir(journal_dir) if n.endswith(".jsonl"))
+
+
+def test_buffered_messages_commit_as_one_group(writer, users, journal_dir, monkeypatch):
+    writer.submit(new_message(users, "one"))
+    writer.submit(new_message(users, "two"))
+    assert stored_contents() == []
+    assert len(writer.scheduled) == 1  # one delayed flush for the group
+    (journal,) = journals(journal_dir)
+    with open(os.path.join(journal_dir, journal)) as f:
+        assert [json.loads(line)["content"] for line in f] == ["one", "two"]
+
+    commits = []
+    real_commit = lahcenger.db.session.commit
+    monkeypatch.setattr(
+        lahcenger.db.session, "commit", lambda: commits.append(1) or real_commit()
+    )
+    writer.flush()
+    assert stored_contents() == ["one", "two"]
+    assert len(commits) == 1
+    assert journals(journal_dir) == []
+
+
+def test_full_batch_flushes_immediately(writer, users):
+    for content in ("a", "b", "c"):
+        writer.submit(new_message(users, content))
+    assert stored_contents() == ["a", "b", "c"]
+
+
+def test_failed_commit_keeps_messages_and_journal(
+    writer, users, journal_dir, monkeypatch
+):
+    writer.submit(new_message(users, "kept"))
+    writer.scheduled.clear()
+    with monkeypatch.context() as m:
+        m.setattr(lahcenger, "insert_messages", lambda msgs: 1 / 0)
+        with pytest.raises(ZeroDivisionError):
+            writer.flush()
+    assert stored_contents() == []
+    assert len(journals(journal_dir)) == 1
+    assert len(writer.scheduled) == 1  # retry scheduled
+
+    writer.submit(new_message(users, "later"))
+    writer.flush()
+    assert stored_contents() == ["kept", "later"]
+    assert journals(journal_dir) == []
+
+
+def test_replays_journal_of_dead_process(writer, users, journal_dir):
+    write_journal(journal_dir, "messages-deadbeef-1.jsonl", [record(users, "one")])
+    write_journal(journal_dir, "messages-deadbeef-2.jsonl", [record(users, "two")])
+    assert writer.recover() == 2
+    assert stored_contents() == ["one", "two"]
+    assert os.listdir(journal_dir) == ["recover.lock"]
+
+
+def test_replay_skips_journals_of_live_processes(writer, users, journal_dir):
+    write_journal(journal_dir, "messages-cafe-1.jsonl", [record(users, "live")])
+    with open(os.path.join(journal_dir, "messages-cafe.lock"), "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)  # its process is running
+        assert writer.recover() == 0
+    assert stored_contents() == []
+    assert journals(journal_dir) == ["messages-cafe-1.jsonl"]
+
+
+def test_replay_is_idempotent(writer, users, journal_dir):
+    committed, lost = record(users, "committed"), record(users, "lost")
+    lahcenger.insert_messages([lahcenger._message_from_record(committed)])
+    lahcenger.db.session.commit()
+    # Crashed after its group committed but before deleting the journal
+    write_journal(journal_dir, "messages-deadbeef-1.jsonl", [committed, lost])
+    assert writer.recover() == 1
+    assert stored_contents() == ["committed", "lost"]
+    assert writer.recover() == 0
+
+
+def test_replay_drops_torn_last_line(writer, users, journal_dir):
+    records = [record(users, "one"), record(users, "two")]
+    write_journal(
+        journal_dir, "messages-deadbeef-1.jsonl", records, tail='{"id": "3", "con'
+    )
+    assert writer.recover() == 2
+    assert stored_contents() == ["one", "two"]
+
+
+def test_leftover_journal_under_reused_pid_is_replayed(writer, users, journal_dir):
+    # e.g. the previous container also ran as pid 1
+    name = f"messages-{os.getpid()}-1.jsonl"
+    write_journal(journal_dir, name, [record(users, "before restart")])
+    writer.submit(new_message(users, "after restart"))
+    assert stored_contents() == ["before restart"]
+    assert name not in journals(journal_dir)
+    writer.flush()
+    assert stored_contents() == ["after restart", "before restart"]
+
+
+def test_failed_replay_does_not_drop_the_new_message(
+    writer, users, journal_dir, monkeypatch
+):
+    write_journal(journal_dir, "messages-deadbeef-1.jsonl", [record(users, "old")])
+    with monkeypatch.context() as m:
+        m.setattr(writer, "_replay", lambda path: 1 / 0)
+        writer.submit(new_message(users, "new"))
+    writer.flush()
+    assert stored_contents() == ["new"]
+    # Tried again on the next submit
+    writer.submit(new_message(users, "newer"))
+    assert stored_contents() == ["new", "old"]
+
+
+def test_recoveries_take_turns(app, writer, users, journal_dir):
+    write_journal(journal_dir, "messages-deadbeef-1.jsonl", [record(users, "one")])
+    results = []
+
+    def recover():
+        with app.app_context():
+            results.append(writer.recover())
+
+    with open(os.path.join(journal_dir, "recover.lock"), "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)  # another worker is replaying
+        thread = threading.Thread(target=recover)
+        thread.start()
+        thread.join(0.3)
+        assert thread.is_alive() and results == []
+    thread.join(5)
+    assert results == [1]
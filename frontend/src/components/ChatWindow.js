@@ -7,15 +7,21 @@ import sendIconButton from "../assets/sendIcon.png";
 import useCurrentlyWriting from "../hooks/useCurrentlyWriting";
 import { useSocket } from "../contexts/SocketContext";
 
+// Messages per history request; a full page means there may be older ones
+const HISTORY_PAGE_SIZE = 50;
+
 export default function ChatWindow({ friend_recipient, closeChat }) {
   const { apiFetch, user } = useAuth();
   const { socket } = useSocket();
   const [msgContent, setMsgContent] = useState("");
   const [messages, setMessages] = useState([]);
+  const [hasOlder, setHasOlder] = useState(false);
   const messageInput = useRef(null);
   const conversation = useRef(null);
   const formMessage = useRef(null);
   const isWritingDiv = useRef(null);
+  // Distance from the bottom to restore after older messages are prepended
+  const keepScrollFrom = useRef(null);
   const { heIsWriting } = useCurrentlyWriting(
     messageInput,
     socket,
@@ -36,12 +42,15 @@ export default function ChatWindow({ friend_recipient, closeChat }) {
   useEffect(() => {
     let ignore = false;
     const loadMessages = async () => {
-      return await apiFetch(`${API_MESSAGES_HISTORY}/${friend_recipient.id}`);
+      return await apiFetch(
+        `${API_MESSAGES_HISTORY}/${friend_recipient.id}?limit=${HISTORY_PAGE_SIZE}`
+      );
     };
     if (!ignore) {
       loadMessages().then((msgs) => {
-        if (!ignore) {
+        if (!ignore && Array.isArray(msgs)) {
           setMessages(msgs);
+          setHasOlder(msgs.length === HISTORY_PAGE_SIZE);
         }
       });
     }
@@ -50,6 +59,21 @@ export default function ChatWindow({ friend_recipient, closeChat }) {
     };
   }, [user, friend_recipient.id, apiFetch]);
 
+  const loadOlderMessages = useCallback(async () => {
+    // Messages received live have no cursor; the oldest loaded one does
+    const oldest = messages.find((message) => message.cursor);
+    if (!oldest) return;
+    const older = await apiFetch(
+      `${API_MESSAGES_HISTORY}/${friend_recipient.id}?limit=${HISTORY_PAGE_SIZE}` +
+        `&before=${encodeURIComponent(oldest.cursor)}`
+    );
+    if (!Array.isArray(older)) return;
+    keepScrollFrom.current =
+      conversation.current.scrollHeight - conversation.current.scrollTop;
+    setHasOlder(older.length === HISTORY_PAGE_SIZE);
+    setMessages((prev) => [...older, ...prev]);
+  }, [messages, friend_recipient.id, apiFetch]);
+
   const submitMessage = useCallback(
     (e) => {
       e.preventDefault();
@@ -85,7 +109,13 @@ export default function ChatWindow({ friend_recipient, closeChat }) {
   }, [socket, friend_recipient, user]);
 
   useEffect(() => {
-    conversation.current.scrollTop = conversation.current.scrollHeight;
+    const element = conversation.current;
+    if (keepScrollFrom.current != null) {
+      element.scrollTop = element.scrollHeight - keepScrollFrom.current;
+      keepScrollFrom.current = null;
+    } else {
+      element.scrollTop = element.scrollHeight;
+    }
   }, [messages]);
 
   useEffect(() => {
@@ -110,12 +140,22 @@ export default function ChatWindow({ friend_recipient, closeChat }) {
             <button onClick={() => closeChat(friend_recipient)}>
               Close this chat
             </button>
-            <button onClick={() => setMessages([])}>
+            <button
+              onClick={() => {
+                setMessages([]);
+                setHasOlder(false);
+              }}
+            >
               Clear messages from UI
             </button>
           </div>
         </header>
         <div className="conversation" ref={conversation}>
+          {hasOlder && (
+            <button className="load-older-messages" onClick={loadOlderMessages}>
+              Load older messages
+            </button>
+          )}
           {messages.map((message, index) => (
             <Message
               key={message.id}